@@ -1,15 +1,24 @@
 import os
 import sys
 import argparse
-import subprocess
+import functools
 from typing import List
 
+# subprocess, json, and shlex are imported inside the functions that use
+# them so -i and --help runs don't pay for modules they never touch
+
 # Constants for default files
 DEFAULT_CONFIG_FILE = "config.ini"
 BACKUP_FILE = "config_backup.ini"
 
+# Cache for the networksetup service listing, invalidated whenever the
+# system network preferences change
+SERVICES_CACHE_FILE = os.path.expanduser("~/.mroute_services.json")
+NETWORK_PREFS = "/Library/Preferences/SystemConfiguration/preferences.plist"
+
 def run_command(command: List[str]) -> str:
     """Run a shell command and return its output."""
+    import subprocess
     try:
         result = subprocess.run(command, check=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
         return result.stdout.strip()
@@ -47,6 +56,7 @@ GATEWAY
 def parse_config_file(config_file: str):
     """Parse configuration file into structured data."""
     dns_servers, search_domains, routes, gateway = [], [], [], ""
+    bucket = {"DNS": dns_servers, "DOMAIN": search_domains, "ROUTES": routes}
     section = None
 
     if not os.path.exists(config_file):
@@ -54,27 +64,44 @@ def parse_config_file(config_file: str):
         sys.exit(1)
 
     with open(config_file, "r") as file:
-        for line in file:
-            line = line.strip()
-            if not line or line.startswith("#"):
-                continue
-            if line in ["DNS", "DOMAIN", "ROUTES", "GATEWAY"]:
+        # One strip pass per line; blank and comment lines drop out here
+        for line in (s for s in map(str.strip, file) if s and s[0] != "#"):
+            if line in bucket or line == "GATEWAY":
                 section = line
-            elif section == "DNS":
-                dns_servers.append(line)
-            elif section == "DOMAIN":
-                search_domains.append(line)
-            elif section == "ROUTES":
-                routes.append(line)
             elif section == "GATEWAY":
                 gateway = line
+            elif section in bucket:
+                bucket[section].append(line)
 
     return dns_servers, search_domains, routes, gateway
 
-def list_network_services() -> List[str]:
-    """List all available network services."""
+@functools.lru_cache(maxsize=1)
+def get_network_services(use_cache: bool = True) -> tuple:
+    """Fetch available network services, caching the listing on disk."""
+    import json
+    key = None
+    if use_cache:
+        try:
+            key = str(os.stat(NETWORK_PREFS).st_mtime_ns)
+            with open(SERVICES_CACHE_FILE, "r") as file:
+                cached = json.load(file)
+            if cached.get("key") == key:
+                return tuple(cached["services"])
+        except (OSError, ValueError, KeyError):
+            pass
     output = run_command(["networksetup", "-listallnetworkservices"])
     services = output.split("\n")[1:]  # Skip the header
+    if key is not None:
+        try:
+            with open(SERVICES_CACHE_FILE, "w") as file:
+                json.dump({"key": key, "services": services}, file)
+        except OSError:
+            pass
+    return tuple(services)
+
+def list_network_services(use_cache: bool = True) -> List[str]:
+    """List all available network services."""
+    services = list(get_network_services(use_cache))
     for i, service in enumerate(services, 1):
         print(f"{i}. {service}")
     return services
@@ -89,6 +116,34 @@ def select_network_service(services: List[str]) -> str:
             pass
         print("Invalid selection. Try again.")
 
+def add_routes(routes: List[str], gateway: str):
+    """Add all routes in one sudo invocation, falling back to one per route."""
+    import shlex
+    import subprocess
+    # Chain with && so the script stops at the first failing route instead
+    # of masking mid-batch failures behind the last command's exit status
+    script = " && ".join(f"route add {shlex.quote(route)} {shlex.quote(gateway)}" for route in routes)
+    result = subprocess.run(["sudo", "/bin/sh", "-c", script],
+                            stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
+    if result.returncode == 0:
+        for route in routes:
+            print(f"Route added: {route} via {gateway}")
+        return
+    if result.stderr.strip():
+        print(f"Error: {result.stderr.strip()}")
+    print("Batch route addition failed; adding routes individually...")
+    for route in routes:
+        result = subprocess.run(["sudo", "route", "add", route, gateway],
+                                stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
+        if result.returncode == 0:
+            print(f"Route added: {route} via {gateway}")
+        elif "File exists" in result.stderr:
+            # Routes the batch already added before it failed
+            print(f"Route already present: {route}")
+        else:
+            print(f"Error: {result.stderr.strip()}")
+            sys.exit(1)
+
 def set_configuration(interface: str, dns: List[str], domains: List[str], routes: List[str], gateway: str):
     if dns:
         print("Configuring DNS...")
@@ -100,9 +155,7 @@ def set_configuration(interface: str, dns: List[str], domains: List[str], routes
         print(f"Search domains set to: {', '.join(domains)}")
     if routes and gateway:
         print("Adding routes...")
-        for route in routes:
-            run_command(["sudo", "route", "add", route, gateway])
-            print(f"Route added: {route} via {gateway}")
+        add_routes(routes, gateway)
     else:
         print("Skipping routes: No routes or gateway specified.")
 
@@ -114,11 +167,18 @@ def reset_configuration(interface: str):
 
 def backup_configuration(interface: str, output_file: str = BACKUP_FILE):
     print("Backing up configuration...")
+    import subprocess
+    # Launch both networksetup reads concurrently; wall time is the slower
+    # of the two instead of their sum
+    dns_proc = subprocess.Popen(["networksetup", "-getdnsservers", interface],
+                                stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
+    domain_proc = subprocess.Popen(["networksetup", "-getsearchdomains", interface],
+                                   stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
+    dns, _ = dns_proc.communicate()
+    domain, _ = domain_proc.communicate()
     with open(output_file, "w") as file:
-        dns = run_command(["networksetup", "-getdnsservers", interface])
-        file.write(f"DNS\n{dns}\n\n")
-        domain = run_command(["networksetup", "-getsearchdomains", interface])
-        file.write(f"DOMAIN\n{domain}\n\n")
+        file.write(f"DNS\n{dns.strip()}\n\n")
+        file.write(f"DOMAIN\n{domain.strip()}\n\n")
         file.write("ROUTES\n# Manual routes are not backed up.\n\n")
         file.write("GATEWAY\n# Manual gateway is not backed up.\n")
     print(f"Backup saved to {output_file}.")
@@ -131,25 +191,32 @@ def main():
     parser.add_argument("-i", action="store_true", help="Create default configuration file")
     parser.add_argument("-f", metavar="CONFIG", help="Configuration file")
     parser.add_argument("-p", metavar="INTERFACE", help="Network interface")
+    parser.add_argument("--no-cache", action="store_true", help="Bypass the network service listing cache")
     args = parser.parse_args()
 
     if args.i:
         create_default_config_file()
         sys.exit(0)
 
-    services = list_network_services() if not args.p else []
-    interface = args.p or select_network_service(services)
+    if not (args.r or args.b or args.s):
+        parser.print_help()
+        return
+
+    # Enumerate network services only when no interface was given; -p
+    # paths never pay for the networksetup listing
+    if args.p:
+        interface = args.p
+    else:
+        interface = select_network_service(list_network_services(use_cache=not args.no_cache))
 
     if args.r:
         reset_configuration(interface)
     elif args.b:
         backup_configuration(interface)
-    elif args.s:
+    else:
         config_file = args.f or DEFAULT_CONFIG_FILE
         dns, domains, routes, gateway = parse_config_file(config_file)
         set_configuration(interface, dns, domains, routes, gateway)
-    else:
-        parser.print_help()
 
 if __name__ == "__main__":
     main()
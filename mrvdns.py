@@ -1,58 +1,310 @@
 #!/usr/bin/env python3
 
-import ipaddress
 import argparse
-import subprocess
-from concurrent.futures import ThreadPoolExecutor
+import os
+import re
+import sys
+import time
 
-# Function to perform Reverse DNS Lookup using nslookup with a custom DNS server
-def reverse_dns_lookup(ip, dns_server):
+# Heavier modules (asyncio, ipaddress, subprocess, concurrent.futures) and
+# the optional accelerators (dnspython, aiodns, uvloop) are imported inside
+# the functions that need them so -h, -i style quick runs and early error
+# paths skip their cost
+dns = None     # dnspython package, imported on first build_resolver call
+aiodns = None  # aiodns package, imported on first load_aiodns call
+
+# Function to import aiodns on first use; returns None when unavailable
+def load_aiodns():
+    global aiodns
+    if aiodns is None:
+        try:
+            import aiodns
+        except ImportError:
+            return None
+    return aiodns
+
+# PTR results are cached across runs; entries expire after 12 hours
+CACHE_FILE = os.path.expanduser("~/.mrvdns_cache.json")
+CACHE_TTL = 12 * 3600
+
+# Function to load the on-disk PTR cache, dropping expired entries
+def load_ptr_cache():
+    import json
+    try:
+        with open(CACHE_FILE, "r") as file:
+            raw = json.load(file)
+        now = time.time()
+        return {key: (name, expiry) for key, (name, expiry) in raw.items() if expiry > now}
+    except (OSError, ValueError, TypeError, AttributeError):
+        # Unreadable, malformed, or wrong-shape cache files start fresh
+        return {}
+
+# Function to persist the PTR cache to disk
+def save_ptr_cache(cache):
+    import json
+    try:
+        with open(CACHE_FILE, "w") as file:
+            json.dump(cache, file)
+    except OSError:
+        pass
+
+# Function to build a shared resolver pointed at the custom DNS server
+def build_resolver(dns_server):
+    global dns
+    if dns is None:
+        try:
+            import dns.resolver
+        except ImportError:
+            return None
+    resolver = dns.resolver.Resolver(configure=False)
+    resolver.nameservers = [dns_server]
+    resolver.lifetime = 5
+    return resolver
+
+# Function to perform Reverse DNS Lookup with a custom DNS server;
+# returns an (ip, name) tuple, formatted only at output time
+def reverse_dns_lookup(ip, dns_server, resolver=None, cache=None):
+    if cache is not None:
+        cached = cache.get(f"{dns_server}|{ip}")
+        if cached is not None:
+            return (ip, cached[0])
+    if resolver is not None:
+        try:
+            answer = resolver.resolve_address(ip)
+            name = answer[0].to_text()
+        except dns.resolver.NXDOMAIN:
+            name = "No PTR Record Found"
+        except dns.resolver.LifetimeTimeout:
+            return (ip, "Timeout")
+        except Exception as e:
+            return (ip, f"Error: {str(e)}")
+        if cache is not None:
+            cache[f"{dns_server}|{ip}"] = (name, time.time() + CACHE_TTL)
+        return (ip, name)
+    # Fallback: spawn nslookup and scrape its output; scan the raw bytes
+    # and decode only the matched PTR name
+    import subprocess
     try:
         result = subprocess.run(
             ["nslookup", ip, dns_server],
             stdout=subprocess.PIPE,
             stderr=subprocess.DEVNULL,
-            text=True,
+            stdin=subprocess.DEVNULL,
             timeout=5
         )
-        output = result.stdout
-        for line in output.splitlines():
-            if "name =" in line:
-                reverse_name = line.split("name =")[-1].strip()
-                return f"{ip}\t{reverse_name}"
-        return f"{ip}\tNo PTR Record Found"
+        name = "No PTR Record Found"
+        for line in result.stdout.split(b"\n"):
+            if b"name =" in line:
+                name = line.split(b"name =")[-1].strip().decode()
+                break
+        if cache is not None:
+            cache[f"{dns_server}|{ip}"] = (name, time.time() + CACHE_TTL)
+        return (ip, name)
     except subprocess.TimeoutExpired:
-        return f"{ip}\tTimeout"
+        return (ip, "Timeout")
     except Exception as e:
-        return f"{ip}\tError: {str(e)}"
+        return (ip, f"Error: {str(e)}")
+
+# Async path: keep many PTR queries in flight from one thread, growing the
+# in-flight window on success and backing off on timeouts (mass-rdns style)
+async def async_reverse_dns_lookups(ip_list, dns_server, cache, handle_result, sweep_zones=None):
+    import asyncio
+    resolver = aiodns.DNSResolver(nameservers=[dns_server], timeout=5)
+    capacity = 2.0  # adaptive window; grows by ~1 per round of successes
+    permits = 2     # permits currently handed to the semaphore
+    failures = 0    # consecutive timeouts
+    semaphore = asyncio.Semaphore(permits)
+    sweep_zones = sweep_zones or ()  # /24s eligible for empty-zone skipping
+    zone_state = {}  # per-/24 "empty"/"mixed" verdicts
+    zone_lock = asyncio.Lock()
+
+    async def probe(ip):
+        try:
+            await resolver.gethostbyaddr(ip)
+            return False
+        except aiodns.error.DNSError as e:
+            return e.args[0] == aiodns.error.ARES_ENOTFOUND
+        except Exception:
+            return False
+
+    async def check_zone(zone):
+        state = zone_state.get(zone)
+        if state is None:
+            async with zone_lock:
+                state = zone_state.get(zone)
+                if state is None:
+                    # Probe the edges of the /24; if both are NXDOMAIN,
+                    # treat the whole block as having no PTR records
+                    probes = await asyncio.gather(probe(f"{zone}.1"), probe(f"{zone}.254"))
+                    state = "empty" if all(probes) else "mixed"
+                    zone_state[zone] = state
+        return state
+
+    async def query(ip):
+        nonlocal capacity, failures
+        zone = ip.rsplit(".", 1)[0]
+        if zone in sweep_zones and await check_zone(zone) == "empty":
+            return (ip, "No PTR (zone empty)")
+        try:
+            host = await resolver.gethostbyaddr(ip)
+            failures = 0
+            capacity += 1 / int(capacity)
+            cache[f"{dns_server}|{ip}"] = (host.name, time.time() + CACHE_TTL)
+            return (ip, host.name)
+        except aiodns.error.DNSError as e:
+            code = e.args[0]
+            if code == aiodns.error.ARES_ENOTFOUND:
+                failures = 0
+                capacity += 1 / int(capacity)
+                cache[f"{dns_server}|{ip}"] = ("No PTR Record Found", time.time() + CACHE_TTL)
+                return (ip, "No PTR Record Found")
+            if code == aiodns.error.ARES_ETIMEOUT:
+                failures += 1
+                if failures >= 3:
+                    capacity = max(2.0, capacity * 0.7)
+                    failures = 0
+                else:
+                    capacity = max(2.0, capacity * 0.9)
+                return (ip, "Timeout")
+            return (ip, f"Error: {e.args[1]}")
+        except Exception as e:
+            return (ip, f"Error: {str(e)}")
+
+    async def lookup(ip):
+        nonlocal permits
+        try:
+            result = await query(ip)
+        finally:
+            # Resize the semaphore toward the new window before handing
+            # back this permit; shrink by withholding the release
+            target = max(2, int(capacity))
+            if target >= permits:
+                for _ in range(target - permits + 1):
+                    semaphore.release()
+                permits = target
+            else:
+                permits -= 1
+        handle_result(result)
+
+    # Submit lazily: acquire a permit before creating each task so only the
+    # current window of lookups (plus their IP strings) exists at any time
+    pending = set()
+    for ip in ip_list:
+        cached = cache.get(f"{dns_server}|{ip}")
+        if cached is not None:
+            handle_result((ip, cached[0]))
+            continue
+        await semaphore.acquire()
+        task = asyncio.ensure_future(lookup(ip))
+        pending.add(task)
+        task.add_done_callback(pending.discard)
+    if pending:
+        await asyncio.gather(*list(pending))
+
+# Threaded fallback: process in batches, growing the worker count while
+# timeouts stay rare and shrinking it when they spike, mirroring the
+# adaptive window of the async path
+def threaded_reverse_dns_lookups(ip_list, dns_server, resolver, cache, workers, handle_result, sweep_zones=None):
+    import itertools
+    import threading
+    from collections import deque
+    from concurrent.futures import ThreadPoolExecutor, as_completed
+    window = deque(maxlen=50)  # sliding window of recent timeout outcomes
+    sweep_zones = sweep_zones or ()  # /24s eligible for empty-zone skipping
+    zone_state = {}  # per-/24 "empty"/"mixed" verdicts
+    zone_lock = threading.Lock()
 
-# Function to generate sequential IP addresses
+    def lookup(ip):
+        zone = ip.rsplit(".", 1)[0]
+        if zone in sweep_zones:
+            state = zone_state.get(zone)
+            if state is None:
+                with zone_lock:
+                    state = zone_state.get(zone)
+                    if state is None:
+                        # Probe the edges of the /24; if both are NXDOMAIN,
+                        # treat the whole block as having no PTR records
+                        probes = [reverse_dns_lookup(f"{zone}.1", dns_server, resolver, cache),
+                                  reverse_dns_lookup(f"{zone}.254", dns_server, resolver, cache)]
+                        state = "empty" if all(p[1] == "No PTR Record Found" for p in probes) else "mixed"
+                        zone_state[zone] = state
+            if state == "empty":
+                return (ip, "No PTR (zone empty)")
+        return reverse_dns_lookup(ip, dns_server, resolver, cache)
+
+    executor = ThreadPoolExecutor(max_workers=workers)
+    try:
+        ips = iter(ip_list)
+        while batch := list(itertools.islice(ips, max(workers, 10))):
+            futures = [executor.submit(lookup, ip) for ip in batch]
+            for future in as_completed(futures):
+                result = future.result()
+                handle_result(result)
+                window.append(result[1] == "Timeout")
+            if len(window) < 10:
+                continue
+            timeout_rate = sum(window) / len(window)
+            if timeout_rate < 0.05:
+                new_workers = min(max(workers + 1, int(workers * 1.25)), 256)
+            elif timeout_rate > 0.20:
+                new_workers = max(2, int(workers * 0.7))
+            else:
+                new_workers = workers
+            if new_workers != workers:
+                executor.shutdown(wait=True)
+                workers = new_workers
+                executor = ThreadPoolExecutor(max_workers=workers)
+    finally:
+        executor.shutdown(wait=True)
+
+# Function to generate sequential IP addresses on demand
 def generate_sequential_ips(subnet):
-    network = ipaddress.IPv4Network(f"{subnet}.0/24", strict=False)
-    return [str(ip) for ip in network.hosts()]
+    return expand_cidr_range(f"{subnet}.0/24")
 
-# Function to expand CIDR range into individual IPs
+# Function to expand a CIDR range into individual IPs on demand; iterates
+# plain ints and formats with inet_ntoa instead of building an
+# IPv4Address object per host
 def expand_cidr_range(cidr_range):
+    import ipaddress
+    import socket
+    import struct
     network = ipaddress.IPv4Network(cidr_range, strict=False)
-    return [str(ip) for ip in network.hosts()]
+    first = int(network.network_address)
+    last = int(network.broadcast_address)
+    if last - first <= 1:
+        # /31 and /32 have no network/broadcast addresses to exclude
+        hosts = range(first, last + 1)
+    else:
+        hosts = range(first + 1, last)
+    return (socket.inet_ntoa(struct.pack("!I", i)) for i in hosts)
 
-# Function to read IPs and CIDR ranges from a file
+# Cheap pre-check for dotted-quad lines; avoids ipaddress parsing per entry
+IP_RE = re.compile(r"^(\d{1,3})\.(\d{1,3})\.(\d{1,3})\.(\d{1,3})$")
+
+# Function to read IPs and CIDR ranges from a file, yielding as it goes
 def read_ips_and_ranges_from_file(file_path):
-    all_ips = []
     with open(file_path, "r") as file:
-        for line in file:
-            entry = line.strip()
-            if not entry:
-                continue
-            try:
-                if '/' in entry:
-                    all_ips.extend(expand_cidr_range(entry))
+        # One strip pass per line; blank and comment lines drop out here
+        for entry in (s for s in map(str.strip, file) if s and s[0] != "#"):
+            if '/' in entry:
+                try:
+                    yield from expand_cidr_range(entry)
+                except ValueError:
+                    print(f"Invalid entry in file: {entry}, skipping.")
+            else:
+                match = IP_RE.match(entry)
+                if match and all(int(octet) <= 255 for octet in match.groups()):
+                    yield entry
                 else:
-                    ipaddress.IPv4Address(entry)
-                    all_ips.append(entry)
-            except ValueError:
-                print(f"Invalid entry in file: {entry}, skipping.")
-    return all_ips
+                    print(f"Invalid entry in file: {entry}, skipping.")
+
+# Function to drop duplicate IPs from the stream while preserving order
+def deduplicate_ips(ip_list):
+    seen = set()
+    for ip in ip_list:
+        if ip not in seen:
+            seen.add(ip)
+            yield ip
 
 # Main function
 def main():
@@ -65,38 +317,78 @@ def main():
     parser.add_argument("-t", "--threads", help="Number of concurrent threads (default: 10)", type=int, default=10)
     args = parser.parse_args()
 
-    # Collect all IPs
-    ip_list = []
+    # Chain all IP sources into one lazy stream; nothing is materialized
+    ip_sources = []
     if args.subnet:
         print(f"Generating sequential IP range for subnet: {args.subnet}.0/24")
-        ip_list.extend(generate_sequential_ips(args.subnet))
+        ip_sources.append(generate_sequential_ips(args.subnet))
     if args.cidr:
         print(f"Expanding CIDR range: {args.cidr}")
-        ip_list.extend(expand_cidr_range(args.cidr))
+        ip_sources.append(expand_cidr_range(args.cidr))
     if args.file:
         print(f"Reading IPs and ranges from file: {args.file}")
-        ip_list.extend(read_ips_and_ranges_from_file(args.file))
+        ip_sources.append(read_ips_and_ranges_from_file(args.file))
 
-    if not ip_list:
+    if not ip_sources:
         print("No valid IPs or ranges found. Please provide input using -s, -r, or -f.")
         return
+    import itertools
+    ip_list = deduplicate_ips(itertools.chain.from_iterable(ip_sources))
 
     # Perform Reverse DNS Lookups
     print("Starting Reverse DNS Lookups...")
-    results = []
-    with ThreadPoolExecutor(max_workers=args.threads) as executor:
-        futures = [executor.submit(reverse_dns_lookup, ip, args.dns) for ip in ip_list]
-        for future in futures:
-            result = future.result()
-            print(result)
-            results.append(result)
-
-    # Save results to file if specified
-    if args.output:
-        with open(args.output, "w") as file:
-            file.write("IP Address\tReverse DNS Name\n")
-            file.write("\n".join(results))
-        print(f"Results saved to {args.output}")
+    cache = load_ptr_cache()
+    # Empty-zone skipping is only safe for /24s that -s/-r sweep in full;
+    # explicit IPs from -f must always be queried directly, so collect the
+    # swept zones and gate the heuristic on membership
+    sweep_zones = set()
+    if args.subnet:
+        sweep_zones.add(args.subnet)
+    if args.cidr:
+        import ipaddress
+        network = ipaddress.IPv4Network(args.cidr, strict=False)
+        if network.prefixlen <= 24:
+            for block in network.subnets(new_prefix=24):
+                sweep_zones.add(str(block.network_address).rsplit(".", 1)[0])
+
+    # Stream results to the output file as they arrive instead of
+    # accumulating them in memory for a final join
+    output = open(args.output, "w") if args.output else None
+    if output is not None:
+        output.write("IP Address\tReverse DNS Name\n")
+
+    # Results flow through as (ip, name) tuples and are formatted exactly
+    # once here; block-buffered writes avoid print's per-line flush
+    if hasattr(sys.stdout, "reconfigure"):
+        sys.stdout.reconfigure(line_buffering=False)
+
+    def handle_result(result):
+        line = f"{result[0]}\t{result[1]}\n"
+        sys.stdout.write(line)
+        if output is not None:
+            output.write(line)
+
+    try:
+        if load_aiodns() is not None:
+            import asyncio
+            # uvloop is optional; when installed (typically on Linux) it
+            # swaps in a libuv event loop with lower per-packet syscall
+            # overhead. macOS keeps the default kqueue-backed loop.
+            try:
+                import uvloop
+                uvloop.install()
+            except ImportError:
+                pass
+            asyncio.run(async_reverse_dns_lookups(ip_list, args.dns, cache, handle_result, sweep_zones))
+        else:
+            resolver = build_resolver(args.dns)
+            threaded_reverse_dns_lookups(ip_list, args.dns, resolver, cache, args.threads, handle_result, sweep_zones)
+    finally:
+        sys.stdout.flush()
+        if output is not None:
+            output.close()
+            print(f"Results saved to {args.output}")
+        save_ptr_cache(cache)
 
 if __name__ == "__main__":
     main()